@@ -5,68 +5,66 @@ from __future__ import annotations
 
 import argparse
 import os
-from typing import List, Tuple
+from pathlib import Path
+from typing import Callable, Iterable, List, Tuple
 
 from spec_parser import (
     ALL_ARCHES,
     SpecEntry,
     make_c_identifier,
     normalize_arch_name,
-    read_spec_file,
+    read_spec_exports,
 )
 
 
 def select_exports(
-    entries: List[SpecEntry], target_arch: str
+    entries: Iterable[SpecEntry], target_arch: str
 ) -> List[Tuple[SpecEntry, int]]:
     """Filter spec entries for the requested architecture while preserving order."""
-    selected: List[Tuple[SpecEntry, int]] = []
-    ordinal = 1
-
-    for entry in entries:
-        if entry.entry_type is None:
-            continue
-        if not entry.function_name:
-            continue
-        if not entry.matches_arch(target_arch):
-            continue
-
-        selected.append((entry, ordinal))
-        ordinal += 1
-
-    return selected
+    matching = (
+        entry
+        for entry in entries
+        if entry.entry_type is not None
+        and entry.function_name
+        and entry.matches_arch(target_arch)
+    )
+    return [(entry, ordinal) for ordinal, entry in enumerate(matching, 1)]
 
 
-def format_export_line(
-    entry: SpecEntry,
-    ordinal: int,
+def make_export_formatter(
     arch: str,
     imports_only: bool,
     no_stdcall_suffix: bool,
-) -> str:
-    """Format a DEF export line for the given entry and ordinal."""
-    if not entry.function_name:
-        raise ValueError("Spec entry is missing a function name.")
-
-    internal_name = entry.internal_name or entry.function_name
-    if entry.entry_type == "stub":
-        internal_name = make_c_identifier(internal_name)
-
-    line = f"  {entry.function_name}"
-    if entry.entry_type == "stdcall" and not no_stdcall_suffix:
-        size = entry.arguments_size(arch)
-        line += f"@{size}"
-    if not imports_only and internal_name != entry.function_name:
-        line += f"={internal_name}"
-    line += f" @{ordinal}"
-
-    if entry.entry_type == "extern":
-        line += " DATA"
-
-    if any(modifier == "-private" for modifier in entry.modifiers):
-        line += " PRIVATE"
-
-    return line
+) -> Callable[[SpecEntry, int], str]:
+    """Return a DEF export line formatter specialized for the given flags.
+
+    The flags are fixed for a whole run, so they are resolved once here and
+    the returned function only skips the parts of the line they disable.
+    """
+    stdcall_suffix = not no_stdcall_suffix
+    alias = not imports_only
+
+    def format_line(entry: SpecEntry, ordinal: int) -> str:
+        function_name = entry.function_name
+        if not function_name:
+            raise ValueError("Spec entry is missing a function name.")
+
+        entry_type = entry.entry_type
+        line = f"  {function_name}"
+        if stdcall_suffix and entry_type == "stdcall":
+            line = f"{line}@{entry.arguments_size(arch)}"
+        if alias:
+            internal_name = entry.internal_name or function_name
+            if entry_type == "stub":
+                internal_name = make_c_identifier(internal_name)
+            if internal_name != function_name:
+                line = f"{line}={internal_name}"
+
+        data = " DATA" if entry_type == "extern" else ""
+        private = " PRIVATE" if "-private" in entry.modifiers else ""
+        return f"{line} @{ordinal}{data}{private}"
+
+    return format_line
 
 
 def generate_def_file(
@@ -77,31 +75,25 @@ def generate_def_file(
     no_stdcall_suffix: bool,
 ) -> None:
     """Generate the DEF file contents and write them to disk."""
-    entries = read_spec_file(spec_file)
+    entries = read_spec_exports(spec_file)
     target_arch = normalize_arch_name(arch)
     exports = select_exports(entries, target_arch)
 
-    library_name = os.path.splitext(os.path.basename(spec_file))[0]
+    spec_path = Path(os.path.abspath(spec_file))
+    library_name = spec_path.stem
     if not library_name:
         library_name = "library"
     library_line = f"LIBRARY {library_name}.dll"
-    comment_line = f"; File generated automatically from {os.path.abspath(spec_file)}; do not edit!"
+    comment_line = f"; File generated automatically from {spec_path}; do not edit!"
+
+    Path(output_file).parent.mkdir(parents=True, exist_ok=True)
 
-    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    format_line = make_export_formatter(arch, imports_only, no_stdcall_suffix)
+    lines = [comment_line, "", library_line, "", "EXPORTS"]
+    lines.extend(format_line(entry, ordinal) for entry, ordinal in exports)
 
     with open(output_file, "w", encoding="utf-8") as handle:
-        handle.write(comment_line)
-        handle.write("\n\n")
-        handle.write(library_line)
-        handle.write("\n\n")
-        handle.write("EXPORTS\n")
-        for entry, ordinal in exports:
-            handle.write(
-                format_export_line(
-                    entry, ordinal, arch, imports_only, no_stdcall_suffix
-                )
-            )
-            handle.write("\n")
+        handle.write("\n".join(lines) + "\n")
 
 
 def parse_args() -> argparse.Namespace:
@@ -4,14 +4,14 @@
 from __future__ import annotations
 
 import argparse
-from typing import List
+from typing import Iterable, List
 
 from spec_parser import (
     ALL_ARCHES,
     TYPE_MAP,
     SpecEntry,
     make_c_identifier,
-    read_spec_file,
+    read_spec_exports,
 )
 
 STUB_HEADER = """/*
@@ -37,7 +37,9 @@ WINE_DEFAULT_DEBUG_CHANNEL(msvcrt);
 """
 
 
-def select_stub_entries(entries: List[SpecEntry], target_arch: str) -> List[SpecEntry]:
+def select_stub_entries(
+    entries: Iterable[SpecEntry], target_arch: str
+) -> List[SpecEntry]:
     """Filter spec entries for the requested architecture while preserving order."""
     return list(
         entry
@@ -84,23 +86,24 @@ def format_stub(entry: SpecEntry) -> str:
 
 def generate_stubs_file(spec_file: str, output_file: str, target_arch: str) -> None:
     # print(f"Reading stubs from {spec_file}...")
-    entries = read_spec_file(spec_file)
+    entries = read_spec_exports(spec_file)
     selected = select_stub_entries(entries, target_arch)
     # print(f"  Found {len(selected)} stub exports")
 
     # print(f"\nGenerating {output_file}...")
 
+    parts = [STUB_HEADER]
+    count = 0
+    for entry in selected:
+        stub_code = format_stub(entry)
+        if not stub_code:
+            continue
+        parts.append(stub_code)
+        parts.append("\n")
+        count += 1
+
     with open(output_file, "w", encoding="utf-8") as handle:
-        handle.write(STUB_HEADER)
-
-        count = 0
-        for entry in selected:
-            stub_code = format_stub(entry)
-            if not stub_code:
-                continue
-            handle.write(stub_code)
-            handle.write("\n")
-            count += 1
+        handle.write("".join(parts))
 
     print(f"Generated {count} stubs")
 
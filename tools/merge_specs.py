@@ -11,10 +11,14 @@ This script combines multiple Wine .spec files, ensuring that:
 
 import os
 import sys
-from typing import Dict, List
+from itertools import count
+from typing import Dict, List, Tuple
 
 from spec_parser import SpecEntry, read_spec_file
 
+# (signature key, arch coverage mask) of an export entry
+ExactKey = Tuple[Tuple[object, ...], int]
+
 
 def get_file_basename(filepath: str) -> str:
     """Extract the base name from a file path (e.g., 'msvcrt.spec' -> 'msvcrt')."""
@@ -36,11 +40,30 @@ def merge_spec_files(input_files: List[str], output_file: str):
         # print(f"  Found {len(entries)} lines")
         all_file_entries.append((input_file, entries))
 
-    export_map: Dict[str, List[SpecEntry]] = {}
-    merged_entries = []
+    # Export entries per export name, keyed by their slot in merged_entries
+    # so they stay in insertion order and can be replaced in place.
+    export_map: Dict[str, Dict[int, SpecEntry]] = {}
+    # Entries in an export list never overlap in arch coverage, so an exact
+    # (signature, coverage) match is always a duplicate and can skip the scan.
+    # Entries with empty coverage overlap nothing and are never indexed.
+    exact_map: Dict[str, Dict[ExactKey, SpecEntry]] = {}
+    # Output entries keyed by insertion slot, with a reverse index from
+    # id(entry) to slot so replacements don't have to scan the whole list.
+    merged_entries: Dict[int, SpecEntry] = {}
+    merged_slots: Dict[int, int] = {}
+    next_slot = count()
     duplicate_count = 0
     replaced_count = 0
 
+    def append_merged(entry: SpecEntry) -> int:
+        slot = next(next_slot)
+        merged_entries[slot] = entry
+        merged_slots[id(entry)] = slot
+        return slot
+
+    def exact_key(entry: SpecEntry) -> ExactKey:
+        return entry.signature_key(), entry.arch_mask()
+
     def replace_entry(
         export_key: str,
         old: SpecEntry,
@@ -49,22 +72,24 @@ def merge_spec_files(input_files: List[str], output_file: str):
     ):
         nonlocal replaced_count
 
-        export_list = export_map.setdefault(export_key, [])
+        export_list = export_map.setdefault(export_key, {})
+        exact_entries = exact_map.setdefault(export_key, {})
+        if exact_entries.get(exact_key(old)) is old:
+            del exact_entries[exact_key(old)]
         if remove:
-            export_list.remove(old)
-            merged_entries.remove(old)
+            slot = merged_slots.pop(id(old))
+            del export_list[slot]
+            del merged_entries[slot]
         else:
-            if old in export_list:
-                idx = export_list.index(old)
-                export_list[idx] = new
-            else:
-                export_list.append(new)
-
-            if old in merged_entries:
-                idx = merged_entries.index(old)
-                merged_entries[idx] = new
+            if new.arch_mask():
+                exact_entries[exact_key(new)] = new
+            slot = merged_slots.pop(id(old), None)
+            if slot is not None:
+                merged_entries[slot] = new
+                merged_slots[id(new)] = slot
             else:
-                merged_entries.append(new)
+                slot = append_merged(new)
+            export_list[slot] = new
 
         replaced_count += 1
 
@@ -81,18 +106,23 @@ def merge_spec_files(input_files: List[str], output_file: str):
         if not export_key:
             return False
 
-        arch_coverage = entry.arch_coverage()
-        export_list = export_map.setdefault(export_key, [])
+        arch_mask = entry.arch_mask()
+        exact_entries = exact_map.setdefault(export_key, {})
+        if arch_mask and exact_key(entry) in exact_entries:
+            duplicate_count += 1
+            return False
+
+        export_list = export_map.setdefault(export_key, {})
 
         replaces = []
-        for idx, existing_entry in enumerate(export_list):
-            existing_coverage = existing_entry.arch_coverage()
-            if arch_coverage.isdisjoint(existing_coverage):
+        for existing_entry in export_list.values():
+            existing_mask = existing_entry.arch_mask()
+            if not arch_mask & existing_mask:
                 # No overlapping architecture coverage, keep both
                 continue
 
             matches_signature = entry.matches_signature(existing_entry)
-            if arch_coverage == existing_coverage:
+            if arch_mask == existing_mask:
                 if matches_signature:
                     # Duplicate entry
                     duplicate_count += 1
@@ -108,13 +138,13 @@ def merge_spec_files(input_files: List[str], output_file: str):
                     duplicate_count += 1
                     return False
 
-            if existing_coverage.issubset(arch_coverage):
+            if existing_mask & arch_mask == existing_mask:
                 if matches_signature:
                     # New entry covers existing one
                     replaces.append(existing_entry)
                     continue
 
-            if arch_coverage.issubset(existing_coverage):
+            if arch_mask & existing_mask == arch_mask:
                 if matches_signature:
                     # Existing entry covers new one
                     duplicate_count += 1
@@ -136,8 +166,9 @@ def merge_spec_files(input_files: List[str], output_file: str):
                 replace_entry(export_key, existing_entry, entry, i != 0)
             return True
 
-        export_list.append(entry)
-        merged_entries.append(entry)
+        export_list[append_merged(entry)] = entry
+        if arch_mask:
+            exact_entries[exact_key(entry)] = entry
         return True
 
     # Track how many entries were added from each file
@@ -148,11 +179,9 @@ def merge_spec_files(input_files: List[str], output_file: str):
         basename = get_file_basename(input_file)
 
         # Add a separator comment
-        merged_entries.append(SpecEntry("", 0, "generated"))
-        merged_entries.append(
-            SpecEntry(f"# Entries from {basename}.spec", 0, "generated")
-        )
-        merged_entries.append(SpecEntry("", 0, "generated"))
+        append_merged(SpecEntry("", 0, "generated"))
+        append_merged(SpecEntry(f"# Entries from {basename}.spec", 0, "generated"))
+        append_merged(SpecEntry("", 0, "generated"))
 
         # Process entries
         added_count = 0
@@ -162,14 +191,14 @@ def merge_spec_files(input_files: List[str], output_file: str):
                     added_count += 1
             else:
                 # Keep comments and blank lines
-                merged_entries.append(entry)
+                append_merged(entry)
 
         added_per_file[basename] = added_count
 
     # Write the merged file
     # print(f"\nWriting merged output to {output_file}...")
     with open(output_file, "w", encoding="utf-8") as f:
-        for entry in merged_entries:
+        for entry in merged_entries.values():
             f.write(entry.line + "\n")
 
     # print("\nMerge complete!")
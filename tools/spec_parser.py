@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import functools
+import os
 import re
-from typing import Dict, FrozenSet, List, Optional, Tuple
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple
 
 ARCH_ALIASES = {
     "i486": "i386",
@@ -39,6 +41,13 @@ SPECIAL_ARCH_GROUPS = {
 
 ALL_ARCHES: FrozenSet[str] = frozenset(WIN32_ARCHES | WIN64_ARCHES)
 
+# One bit per concrete architecture, for cheap coverage comparisons
+ARCH_BITS: Dict[str, int] = {
+    arch: 1 << index for index, arch in enumerate(sorted(ALL_ARCHES))
+}
+# Bits handed out to architecture names outside ARCH_BITS, in first-seen order
+_EXTRA_ARCH_BITS: Dict[str, int] = {}
+
 TYPE_MAP: Dict[str, str] = {
     "word": "unsigned short",
     "s_word": "short",
@@ -55,8 +64,7 @@ TYPE_MAP: Dict[str, str] = {
 }
 
 
-def expand_arch(name: str) -> FrozenSet[str]:
-    """Expand an architecture or architecture group, preserving negation."""
+def _expand_arch_uncached(name: str) -> FrozenSet[str]:
     normalized = normalize_arch_name(name)
     if not normalized:
         return frozenset()
@@ -74,6 +82,26 @@ def expand_arch(name: str) -> FrozenSet[str]:
     return frozenset(entries)
 
 
+# Precomputed expansions of every known architecture, group and alias name
+_EXPAND_ARCH_CACHE: Dict[str, FrozenSet[str]] = {
+    f"{prefix}{name}": _expand_arch_uncached(f"{prefix}{name}")
+    for name in (*ALL_ARCHES, *SPECIAL_ARCH_GROUPS, *ARCH_ALIASES)
+    for prefix in ("", "!")
+}
+
+
+def expand_arch(name: str) -> FrozenSet[str]:
+    """Expand an architecture or architecture group, preserving negation."""
+    expanded = _EXPAND_ARCH_CACHE.get(name)
+    if expanded is None:
+        expanded = _expand_arch_uncached(name)
+    return expanded
+
+
+_COMMENT_SCAN_RE = re.compile(r"[()#]")
+_TOKEN_SCAN_RE = re.compile(r"\(|\)|\s+|[^\s()]+")
+
+
 def get_pointer_size(arch: str) -> int:
     if arch in WIN32_ARCHES:
         return 4
@@ -86,6 +114,26 @@ def get_pointer_size(arch: str) -> int:
 class SpecEntry:
     """Represents a single entry in a Wine .spec file."""
 
+    __slots__ = (
+        "line",
+        "line_num",
+        "source_file",
+        "entry_type",
+        "modifiers",
+        "function_name",
+        "args",
+        "internal_name",
+        "comment",
+        "_arch_targets",
+        "_arch_coverage",
+        "_arch_mask",
+        "_arch_restricted",
+        "_non_arch_mods",
+        "_sig_key",
+        "_arg_types",
+        "_arg_sizes",
+    )
+
     def __init__(self, line: str, line_num: int, source_file: str):
         self.line = line.rstrip()
         self.line_num = line_num
@@ -95,7 +143,8 @@ class SpecEntry:
         self.entry_type: Optional[str] = (
             None  # cdecl, stub, varargs, stdcall, thiscall, extern
         )
-        self.modifiers: List[str] = []  # -ret64, -arch=X, -norelay, -private, etc.
+        # -ret64, -arch=X, -norelay, -private, etc.
+        self.modifiers: Tuple[str, ...] = ()
         self.function_name: Optional[str] = (
             None  # Exported function name (without args)
         )
@@ -105,7 +154,17 @@ class SpecEntry:
         )
         self.comment: Optional[str] = None  # Comment after #
 
-        if self.line.strip().startswith("@"):
+        # Lazily computed from modifiers, which are fixed once parsed
+        self._arch_targets: Optional[Tuple[str, ...]] = None
+        self._arch_coverage: Optional[FrozenSet[str]] = None
+        self._arch_mask: Optional[int] = None
+        self._arch_restricted = False
+        self._non_arch_mods: Optional[Tuple[str, ...]] = None
+        self._sig_key: Optional[Tuple[object, ...]] = None
+        self._arg_types: Optional[Tuple[str, ...]] = None
+        self._arg_sizes: Optional[Dict[str, int]] = None
+
+        if self.line.lstrip().startswith("@"):
             self._parse_export_entry()
 
     def _parse_export_entry(self) -> None:
@@ -116,20 +175,32 @@ class SpecEntry:
             return
 
         content = line[1:].lstrip()
-        content, comment = self._split_comment(content)
-        self.comment = comment
-
-        tokens = self._tokenize(content)
+        if "(" not in content:
+            # No argument list, so no parentheses can hide '#' or whitespace
+            content, sep, comment = content.partition("#")
+            self.comment = comment.strip() if sep else None
+            tokens = content.split()
+        else:
+            split = self._split_single_group(content)
+            if split is None:
+                content, comment = self._split_comment(content)
+                tokens = self._tokenize(content)
+            else:
+                tokens, comment = split
+            self.comment = comment
         if not tokens:
             return
 
         self.entry_type = tokens[0]
 
+        modifiers: List[str] = []
         idx = 1
         while idx < len(tokens) and tokens[idx].startswith("-"):
             modifier = tokens[idx]
-            self.modifiers.append(modifier)
+            modifiers.append(modifier)
             idx += 1
+        self.modifiers = tuple(modifiers)
+        self._arch_restricted = any(m.startswith("-arch=") for m in modifiers)
 
         if idx < len(tokens):
             func_token = tokens[idx]
@@ -157,17 +228,63 @@ class SpecEntry:
         if not self.internal_name and self.function_name:
             self.internal_name = self.function_name
 
+        # Fields are final now; build the comparison key up front
+        self.signature_key()
+
+    @staticmethod
+    def _split_single_group(
+        text: str,
+    ) -> Optional[Tuple[List[str], Optional[str]]]:
+        """Tokenize text containing one parenthesized group using str methods.
+
+        Returns None for nested or repeated parentheses, which need the
+        general _split_comment/_tokenize path.
+        """
+        open_pos = text.find("(")
+        close_pos = text.find(")", open_pos)
+        if close_pos == -1 or text.count("(") != 1 or text.count(")") != 1:
+            return None
+
+        # A '#' inside the group does not start a comment
+        hash_pos = text.find("#")
+        if open_pos < hash_pos < close_pos:
+            hash_pos = text.find("#", close_pos)
+        if hash_pos != -1 and hash_pos < open_pos:
+            return text[:hash_pos].split(), text[hash_pos + 1 :].strip()
+
+        comment = None
+        if hash_pos != -1:
+            comment = text[hash_pos + 1 :].strip()
+            text = text[:hash_pos]
+
+        before = text[:open_pos]
+        after = text[close_pos + 1 :]
+        group = text[open_pos : close_pos + 1]
+
+        # The group sticks to any text directly before or after it
+        tokens = before.split()
+        if before and not before[-1].isspace():
+            group = tokens.pop() + group
+        after_tokens = after.split()
+        if after and not after[0].isspace():
+            group += after_tokens.pop(0)
+        tokens.append(group)
+        tokens.extend(after_tokens)
+        return tokens, comment
+
     @staticmethod
     def _split_comment(text: str) -> Tuple[str, Optional[str]]:
         """Split text into content and a trailing comment introduced by #."""
         paren_depth = 0
-        for index, char in enumerate(text):
+        for match in _COMMENT_SCAN_RE.finditer(text):
+            char = match.group()
             if char == "(":
                 paren_depth += 1
             elif char == ")":
                 if paren_depth > 0:
                     paren_depth -= 1
-            elif char == "#" and paren_depth == 0:
+            elif paren_depth == 0:
+                index = match.start()
                 return text[:index].rstrip(), text[index + 1 :].strip()
         return text.strip(), None
 
@@ -177,20 +294,20 @@ class SpecEntry:
         current: List[str] = []
         paren_depth = 0
 
-        for char in text:
-            if char == "(":
+        for piece in _TOKEN_SCAN_RE.findall(text):
+            if piece == "(":
                 paren_depth += 1
-                current.append(char)
-            elif char == ")":
-                current.append(char)
+                current.append(piece)
+            elif piece == ")":
+                current.append(piece)
                 if paren_depth > 0:
                     paren_depth -= 1
-            elif char.isspace() and paren_depth == 0:
+            elif piece[0].isspace() and paren_depth == 0:
                 if current:
                     tokens.append("".join(current))
                     current = []
             else:
-                current.append(char)
+                current.append(piece)
 
         if current:
             tokens.append("".join(current))
@@ -201,20 +318,28 @@ class SpecEntry:
         """Get the export name for deduplication."""
         return self.function_name
 
+    def signature_key(self) -> Tuple[object, ...]:
+        """Return a hashable key that is equal for entries with matching signatures."""
+        if self._sig_key is None:
+            self._sig_key = (
+                self.entry_type,
+                self._non_arch_modifiers(),
+                self.function_name,
+                self.args or "",
+                self.internal_name or "",
+            )
+        return self._sig_key
+
     def matches_signature(self, other: "SpecEntry") -> bool:
         """Check if this entry has the same signature as another."""
-        return (
-            self.entry_type == other.entry_type
-            and self._non_arch_modifiers() == other._non_arch_modifiers()
-            and self.function_name == other.function_name
-            and (self.args or "") == (other.args or "")
-            and (self.internal_name or "") == (other.internal_name or "")
-        )
+        return self.signature_key() == other.signature_key()
 
     def _non_arch_modifiers(self) -> Tuple[str, ...]:
-        mods = [m for m in self.modifiers if not m.startswith("-arch=")]
-        mods.sort()
-        return tuple(mods)
+        if self._non_arch_mods is None:
+            mods = [m for m in self.modifiers if not m.startswith("-arch=")]
+            mods.sort()
+            self._non_arch_mods = tuple(mods)
+        return self._non_arch_mods
 
     def get_canonical_line(self) -> str:
         """Reconstruct the canonical line without comments."""
@@ -239,13 +364,13 @@ class SpecEntry:
 
     def has_arch_modifier(self) -> bool:
         """Return True if any -arch modifier is present."""
-        for modifier in self.modifiers:
-            if modifier.startswith("-arch="):
-                return True
-        return False
+        return self._arch_restricted
 
     def arch_targets(self) -> Tuple[str, ...]:
         """Return a sorted tuple of normalized architectures specified by -arch."""
+        if self._arch_targets is not None:
+            return self._arch_targets
+
         targets = set()
         for modifier in self.modifiers:
             if modifier.startswith("-arch="):
@@ -254,10 +379,14 @@ class SpecEntry:
                     if not name:
                         continue
                     targets.update(expand_arch(name))
-        return tuple(sorted(targets))
+        self._arch_targets = tuple(sorted(targets))
+        return self._arch_targets
 
     def arch_coverage(self) -> FrozenSet[str]:
         """Return the concrete architecture set covered by this entry."""
+        if self._arch_coverage is not None:
+            return self._arch_coverage
+
         include = set()
         exclude = set()
         for target in self.arch_targets():
@@ -274,19 +403,41 @@ class SpecEntry:
             include_positive = set(ALL_ARCHES)
 
         coverage = include_positive - {arch[1:] for arch in exclude_positive}
-        return frozenset(coverage)
-
-    def argument_types(self) -> List[str]:
-        """Return the list of argument specifiers, without parentheses."""
-        if not self.args or len(self.args) < 2:
-            return []
-        inner = self.args[1:-1].strip()
-        if not inner:
-            return []
-        return inner.split()
+        self._arch_coverage = frozenset(coverage)
+        return self._arch_coverage
+
+    def arch_mask(self) -> int:
+        """Return arch_coverage() as a bitmask of ARCH_BITS values."""
+        if self._arch_mask is None:
+            mask = 0
+            for arch in self.arch_coverage():
+                bit = ARCH_BITS.get(arch)
+                if bit is None:
+                    bit = _EXTRA_ARCH_BITS.get(arch)
+                if bit is None:
+                    # Unknown architecture names still need distinct bits
+                    bit = 1 << (len(ARCH_BITS) + len(_EXTRA_ARCH_BITS))
+                    _EXTRA_ARCH_BITS[arch] = bit
+                mask |= bit
+            self._arch_mask = mask
+        return self._arch_mask
+
+    def argument_types(self) -> Tuple[str, ...]:
+        """Return the argument specifiers, without parentheses."""
+        if self._arg_types is None:
+            if not self.args or len(self.args) < 2:
+                self._arg_types = ()
+            else:
+                self._arg_types = tuple(self.args[1:-1].split())
+        return self._arg_types
 
     def arguments_size(self, arch: str) -> int:
         """Return the number of arguments."""
+        if self._arg_sizes is None:
+            self._arg_sizes = {}
+        elif arch in self._arg_sizes:
+            return self._arg_sizes[arch]
+
         pointer_size = get_pointer_size(arch)
         size = 0
         for arg in self.argument_types():
@@ -300,37 +451,91 @@ class SpecEntry:
                     size += 16
             else:
                 size += pointer_size
+        self._arg_sizes[arch] = size
         return size
 
     def matches_arch(self, target_arch: str) -> bool:
         """Return True if the entry applies to the requested architecture."""
-        if not self.has_arch_modifier():
-            return True
-
-        return target_arch in self.arch_coverage()
+        return not self._arch_restricted or target_arch in self.arch_coverage()
 
     def __repr__(self) -> str:
         return f"SpecEntry({self.function_name or self.line!r}, {self.source_file}:{self.line_num})"
 
 
+def _read_spec_lines(filename: str) -> List[str]:
+    """Read a spec file in one go and split it like text-mode iteration would."""
+    with open(filename, "rb") as handle:
+        text = handle.read().decode("utf-8")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    if not lines[-1]:
+        lines.pop()
+    return lines
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_spec_file(
+    filename: str, path: str, device: int, inode: int, mtime_ns: int, size: int
+) -> Tuple[SpecEntry, ...]:
+    return tuple(
+        SpecEntry(line, line_num, filename)
+        for line_num, line in enumerate(_read_spec_lines(path), 1)
+    )
+
+
 def read_spec_file(filename: str) -> List[SpecEntry]:
-    """Read a spec file and return a list of SpecEntry objects."""
-    entries: List[SpecEntry] = []
-    with open(filename, "r", encoding="utf-8") as handle:
-        for line_num, line in enumerate(handle, 1):
-            entries.append(SpecEntry(line, line_num, filename))
-    return entries
+    """Read a spec file and return a list of SpecEntry objects.
+
+    Results are cached in-process by absolute path, device, inode,
+    modification time and size, so repeated reads of an unchanged file skip
+    parsing. The returned list is new, but the entries in it are shared
+    between calls and must be treated as read-only.
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    return list(
+        _parse_spec_file(
+            filename, path, stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+        )
+    )
+
+
+def read_spec_exports(filename: str) -> Iterator[SpecEntry]:
+    """Yield only the export entries of a spec file, skipping other lines.
+
+    Only '@' lines become SpecEntry objects, and nothing is kept once the
+    caller drops them; this bypasses read_spec_file()'s cache.
+    """
+    for line_num, line in enumerate(_read_spec_lines(filename), 1):
+        if not line.lstrip().startswith("@"):
+            continue
+        entry = SpecEntry(line, line_num, filename)
+        if entry.entry_type:
+            yield entry
+
+
+_NON_IDENT_RE = re.compile(r"[^0-9A-Za-z_]")
+_C_IDENTIFIER_CACHE: Dict[str, str] = {}
 
 
 def make_c_identifier(symbol: str) -> str:
     """Return a valid C identifier for the given symbol."""
 
-    base = re.sub(r"[^0-9A-Za-z_]", "_", symbol)
+    cached = _C_IDENTIFIER_CACHE.get(symbol)
+    if cached is not None:
+        return cached
+
+    if symbol.isascii() and symbol.replace("_", "a").isalnum():
+        base = symbol
+    else:
+        base = _NON_IDENT_RE.sub("_", symbol)
     if not base:
         base = "_stub"
     if base[0].isdigit():
         base = f"_{base}"
 
+    _C_IDENTIFIER_CACHE[symbol] = base
     return base
 
 
@@ -340,9 +545,11 @@ __all__ = [
     "WIN64_ARCHES",
     "SPECIAL_ARCH_GROUPS",
     "ALL_ARCHES",
+    "ARCH_BITS",
     "normalize_arch_name",
     "expand_arch",
     "SpecEntry",
     "read_spec_file",
+    "read_spec_exports",
     "make_c_identifier",
 ]